@@ -1,24 +1,76 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 import csv
+import io
 from datetime import datetime, timedelta
+from itertools import cycle, islice
 from pathlib import Path
 import random
+from typing import Iterable, Sequence
 
 
 DATA_DIR = Path(__file__).resolve().parents[1] / "data"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
+USER_FIELDS = ["user_id", "name", "email", "join_date", "loyalty_tier"]
+PRODUCT_FIELDS = ["product_id", "name", "category", "price", "in_stock"]
+ORDER_FIELDS = [
+    "order_id",
+    "user_id",
+    "product_id",
+    "quantity",
+    "order_date",
+    "status",
+    "order_total",
+]
+REVIEW_FIELDS = ["review_id", "order_id", "rating", "comment", "review_date"]
+PAYMENT_FIELDS = ["payment_id", "order_id", "amount", "method", "payment_status"]
+
+
+def write_payload(file_path: Path, payload: bytes) -> None:
+    # Unbuffered raw writes may be partial.
+    view = memoryview(payload)
+    with file_path.open("wb", buffering=0) as raw:
+        while view:
+            written = raw.write(view)
+            view = view[written:]
+
+
+def write_csv(filename: str, fieldnames: list[str], rows: Iterable[Sequence[object]]) -> None:
+    buffer = io.StringIO(newline="")
+    writer = csv.writer(buffer)
+    writer.writerow(fieldnames)
+    writer.writerows(rows)
+    write_payload(DATA_DIR / filename, buffer.getvalue().encode("utf-8"))
+
+
+def write_plain_csv(filename: str, fieldnames: list[str], rows: list[Sequence[object]]) -> None:
+    # Same bytes as csv.writer, including its \r\n line terminator.
+    unsafe = [
+        value
+        for row in rows
+        for value in row
+        if isinstance(value, str) and any(ch in value for ch in ',"\r\n')
+    ]
+    if unsafe:
+        raise ValueError(f"{filename} has fields that need CSV quoting: {unsafe[:3]}")
+    template = ",".join(["{}"] * len(fieldnames)) + "\r\n"
+    text = template.format(*fieldnames) + "".join(template.format(*row) for row in rows)
+    write_payload(DATA_DIR / filename, text.encode("utf-8"))
+
 
-def write_csv(filename: str, fieldnames: list[str], rows: list[dict[str, object]]) -> None:
-    file_path = DATA_DIR / filename
-    with file_path.open("w", newline="", encoding="utf-8") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
+def date_series(base: datetime, count: int, step_days: int = 1) -> list[str]:
+    current = base.date()
+    step = timedelta(days=step_days)
+    dates = []
+    for _ in range(count):
+        dates.append(current.isoformat())
+        current += step
+    return dates
 
 
-def generate_users() -> list[dict[str, object]]:
+def generate_users() -> list[tuple]:
     base_date = datetime(2024, 1, 1)
     names = [
         "Ava Patel",
@@ -38,26 +90,19 @@ def generate_users() -> list[dict[str, object]]:
         "Charlotte Martinez",
     ]
     tiers = ["Bronze", "Silver", "Gold"]
+    join_dates = date_series(base_date, 15, step_days=3)
     users = []
     for idx in range(15):
         name = names[idx]
         user_id = f"U{idx+1:03d}"
         email = name.lower().replace(" ", ".") + "@shopperhub.com"
-        join_date = (base_date + timedelta(days=idx * 3)).date().isoformat()
+        join_date = join_dates[idx]
         tier = tiers[idx % len(tiers)]
-        users.append(
-            {
-                "user_id": user_id,
-                "name": name,
-                "email": email,
-                "join_date": join_date,
-                "loyalty_tier": tier,
-            }
-        )
+        users.append((user_id, name, email, join_date, tier))
     return users
 
 
-def generate_products() -> list[dict[str, object]]:
+def generate_products() -> list[tuple]:
     categories = [
         ("Smartwatch", "Wearables", 149.99),
         ("Noise Cancelling Headphones", "Audio", 199.5),
@@ -77,46 +122,42 @@ def generate_products() -> list[dict[str, object]]:
     ]
     products = []
     for idx, (name, category, price) in enumerate(categories, start=1):
-        products.append(
-            {
-                "product_id": f"P{idx:03d}",
-                "name": name,
-                "category": category,
-                "price": f"{price:.2f}",
-                "in_stock": 50 + idx * 3,
-            }
-        )
+        products.append((f"P{idx:03d}", name, category, f"{price:.2f}", 50 + idx * 3))
     return products
 
 
-def generate_orders(users: list[dict[str, object]], products: list[dict[str, object]]):
-    rng = random.Random(42)
+def cycle_values(values: list[str], count: int) -> list[str]:
+    return list(islice(cycle(values), count))
+
+
+def generate_orders(users: list[tuple], products: list[tuple]) -> list[tuple]:
+    randint = random.Random(42).randint
     base_date = datetime(2024, 2, 1)
     statuses = ["Processing", "Shipped", "Delivered"]
-    price_lookup = {p["product_id"]: float(p["price"]) for p in products}
-    orders = []
-    for idx in range(15):
-        user = users[idx]
-        product = products[idx]
-        quantity = rng.randint(1, 4)
-        order_date = (base_date + timedelta(days=idx)).date().isoformat()
-        status = statuses[idx % len(statuses)]
-        orders.append(
-            {
-                "order_id": f"O{idx+1:03d}",
-                "user_id": user["user_id"],
-                "product_id": product["product_id"],
-                "quantity": quantity,
-                "order_date": order_date,
-                "status": status,
-                "order_total": f"{quantity * price_lookup[product['product_id']]:.2f}",
-            }
+    # Order idx buys products[idx]; price is position 3 of a PRODUCT_FIELDS row.
+    prices_by_pos = [float(p[3]) for p in products]
+    count = 15
+    order_ids = [f"O{idx+1:03d}" for idx in range(count)]
+    user_ids = [user[0] for user in users[:count]]
+    product_ids = [product[0] for product in products[:count]]
+    quantities = [randint(1, 4) for _ in range(count)]
+    order_dates = date_series(base_date, count)
+    totals = [f"{quantity * price:.2f}" for quantity, price in zip(quantities, prices_by_pos)]
+    return list(
+        zip(
+            order_ids,
+            user_ids,
+            product_ids,
+            quantities,
+            order_dates,
+            cycle_values(statuses, count),
+            totals,
         )
-    return orders
+    )
 
 
-def generate_reviews(orders: list[dict[str, object]]):
-    rng = random.Random(7)
+def generate_reviews(orders: list[tuple]) -> list[tuple]:
+    randint = random.Random(7).randint
     comments = [
         "Great value for the price.",
         "Fast shipping and solid quality.",
@@ -125,35 +166,32 @@ def generate_reviews(orders: list[dict[str, object]]):
         "Packaging could be better, product works fine.",
     ]
     base_date = datetime(2024, 3, 1)
-    reviews = []
-    for idx, order in enumerate(orders):
-        reviews.append(
-            {
-                "review_id": f"R{idx+1:03d}",
-                "order_id": order["order_id"],
-                "rating": rng.randint(3, 5),
-                "comment": comments[idx % len(comments)],
-                "review_date": (base_date + timedelta(days=idx)).date().isoformat(),
-            }
+    count = len(orders)
+    return list(
+        zip(
+            [f"R{idx+1:03d}" for idx in range(count)],
+            [order[0] for order in orders],
+            [randint(3, 5) for _ in range(count)],
+            cycle_values(comments, count),
+            date_series(base_date, count),
         )
-    return reviews
+    )
 
 
-def generate_payments(orders: list[dict[str, object]]):
+def generate_payments(orders: list[tuple]) -> list[tuple]:
     methods = ["Credit Card", "PayPal", "Gift Card"]
     statuses = ["Completed", "Completed", "Pending"]
-    payments = []
-    for idx, order in enumerate(orders):
-        payments.append(
-            {
-                "payment_id": f"PM{idx+1:03d}",
-                "order_id": order["order_id"],
-                "amount": order["order_total"],
-                "method": methods[idx % len(methods)],
-                "payment_status": statuses[idx % len(statuses)],
-            }
+    count = len(orders)
+    # Rows follow ORDER_FIELDS: position 0 is order_id, 6 is order_total.
+    return list(
+        zip(
+            [f"PM{idx+1:03d}" for idx in range(count)],
+            [order[0] for order in orders],
+            [order[6] for order in orders],
+            cycle_values(methods, count),
+            cycle_values(statuses, count),
         )
-    return payments
+    )
 
 
 def main():
@@ -163,39 +201,17 @@ def main():
     reviews = generate_reviews(orders)
     payments = generate_payments(orders)
 
-    write_csv(
-        "users.csv",
-        ["user_id", "name", "email", "join_date", "loyalty_tier"],
-        users,
-    )
-    write_csv(
-        "products.csv",
-        ["product_id", "name", "category", "price", "in_stock"],
-        products,
-    )
-    write_csv(
-        "orders.csv",
-        [
-            "order_id",
-            "user_id",
-            "product_id",
-            "quantity",
-            "order_date",
-            "status",
-            "order_total",
-        ],
-        orders,
-    )
-    write_csv(
-        "reviews.csv",
-        ["review_id", "order_id", "rating", "comment", "review_date"],
-        reviews,
-    )
-    write_csv(
-        "payments.csv",
-        ["payment_id", "order_id", "amount", "method", "payment_status"],
-        payments,
-    )
+    tasks = [
+        (write_plain_csv, "users.csv", USER_FIELDS, users),
+        (write_plain_csv, "products.csv", PRODUCT_FIELDS, products),
+        (write_csv, "orders.csv", ORDER_FIELDS, orders),
+        (write_csv, "reviews.csv", REVIEW_FIELDS, reviews),
+        (write_csv, "payments.csv", PAYMENT_FIELDS, payments),
+    ]
+    with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+        futures = [executor.submit(*task) for task in tasks]
+        for future in futures:
+            future.result()
     print(f"Generated CSV files in {DATA_DIR}")
 
 
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+from contextlib import closing
 import csv
+from itertools import chain, islice
+from operator import itemgetter
 import sqlite3
 from pathlib import Path
+from typing import Callable, Iterable, Iterator, Sequence
 
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
@@ -15,7 +19,7 @@ TABLE_CONFIG = [
         "csv": "users.csv",
         "columns": ["user_id", "name", "email", "join_date", "loyalty_tier"],
         "schema": """
-            CREATE TABLE users (
+            CREATE TABLE main.users (
                 user_id TEXT PRIMARY KEY,
                 name TEXT NOT NULL,
                 email TEXT NOT NULL,
@@ -23,13 +27,14 @@ TABLE_CONFIG = [
                 loyalty_tier TEXT NOT NULL
             )
         """,
+        "indexes": [],
     },
     {
         "name": "products",
         "csv": "products.csv",
         "columns": ["product_id", "name", "category", "price", "in_stock"],
         "schema": """
-            CREATE TABLE products (
+            CREATE TABLE main.products (
                 product_id TEXT PRIMARY KEY,
                 name TEXT NOT NULL,
                 category TEXT NOT NULL,
@@ -37,6 +42,7 @@ TABLE_CONFIG = [
                 in_stock INTEGER NOT NULL
             )
         """,
+        "indexes": [],
     },
     {
         "name": "orders",
@@ -51,7 +57,7 @@ TABLE_CONFIG = [
             "order_total",
         ],
         "schema": """
-            CREATE TABLE orders (
+            CREATE TABLE main.orders (
                 order_id TEXT PRIMARY KEY,
                 user_id TEXT NOT NULL,
                 product_id TEXT NOT NULL,
@@ -63,13 +69,14 @@ TABLE_CONFIG = [
                 FOREIGN KEY (product_id) REFERENCES products(product_id)
             )
         """,
+        "indexes": ["CREATE INDEX main.idx_orders_date_id ON orders (order_date, order_id)"],
     },
     {
         "name": "reviews",
         "csv": "reviews.csv",
         "columns": ["review_id", "order_id", "rating", "comment", "review_date"],
         "schema": """
-            CREATE TABLE reviews (
+            CREATE TABLE main.reviews (
                 review_id TEXT PRIMARY KEY,
                 order_id TEXT NOT NULL,
                 rating INTEGER NOT NULL,
@@ -78,13 +85,14 @@ TABLE_CONFIG = [
                 FOREIGN KEY (order_id) REFERENCES orders(order_id)
             )
         """,
+        "indexes": [],
     },
     {
         "name": "payments",
         "csv": "payments.csv",
         "columns": ["payment_id", "order_id", "amount", "method", "payment_status"],
         "schema": """
-            CREATE TABLE payments (
+            CREATE TABLE main.payments (
                 payment_id TEXT PRIMARY KEY,
                 order_id TEXT NOT NULL,
                 amount REAL NOT NULL,
@@ -93,6 +101,7 @@ TABLE_CONFIG = [
                 FOREIGN KEY (order_id) REFERENCES orders(order_id)
             )
         """,
+        "indexes": [],
     },
 ]
 
@@ -105,54 +114,152 @@ FIELD_CONVERTERS = {
     "amount": float,
 }
 
+LOAD_PRAGMAS = """
+PRAGMA main.journal_mode = WAL;
+PRAGMA main.synchronous = NORMAL;
+PRAGMA temp_store = MEMORY;
+PRAGMA main.cache_size = -65536;
+PRAGMA main.mmap_size = 268435456;
+"""
 
-def load_csv(filename: str) -> list[dict[str, object]]:
+# Qualified with main: the attached stage has tables of the same names.
+RESET_SCRIPT = "\n".join(
+    [
+        "PRAGMA foreign_keys = OFF;",
+        "BEGIN IMMEDIATE;",
+        *(f"DROP TABLE IF EXISTS main.{cfg['name']};" for cfg in reversed(TABLE_CONFIG)),
+        *(cfg["schema"].strip() + ";" for cfg in TABLE_CONFIG),
+    ]
+)
+
+STAGE_SCHEMA = "stage"
+STAGE_SCRIPT = "\n".join(
+    [
+        f"ATTACH DATABASE ':memory:' AS {STAGE_SCHEMA};",
+        *(
+            f"CREATE TABLE {STAGE_SCHEMA}.{cfg['name']} ({', '.join(cfg['columns'])});"
+            for cfg in TABLE_CONFIG
+        ),
+        "BEGIN;",
+    ]
+)
+
+SQL_BY_TABLE = {
+    cfg["name"]: f"INSERT INTO {STAGE_SCHEMA}.{cfg['name']} ({', '.join(cfg['columns'])}) VALUES "
+    for cfg in TABLE_CONFIG
+}
+ROW_PLACEHOLDERS_BY_TABLE = {
+    cfg["name"]: "(" + ", ".join(["?"] * len(cfg["columns"])) + ")" for cfg in TABLE_CONFIG
+}
+STATEMENT_CACHE_SIZE = 256
+
+SMALL_TABLE_ROWS = 500
+
+
+def iter_rows(
+    filename: str, columns: list[str], converters: dict[str, Callable[[str], object]]
+) -> Iterator[list[object]]:
     file_path = DATA_DIR / filename
     if not file_path.exists():
         raise FileNotFoundError(f"Missing CSV file: {file_path}")
     with file_path.open(newline="", encoding="utf-8") as csvfile:
-        reader = csv.DictReader(csvfile)
-        rows = []
+        reader = csv.reader(csvfile)
+        header = next(reader, [])
+        missing = [col for col in columns if col not in header]
+        if missing:
+            raise ValueError(f"{file_path} is missing columns: {', '.join(missing)}")
+        positions = [header.index(col) for col in columns]
+        pick = itemgetter(*positions) if len(positions) > 1 else lambda row: (row[positions[0]],)
+        conversions = [(pos, converters[col]) for pos, col in enumerate(columns) if col in converters]
         for row in reader:
-            processed = {}
-            for key, value in row.items():
-                converter = FIELD_CONVERTERS.get(key)
-                processed[key] = converter(value) if converter else value
-            rows.append(processed)
-        return rows
+            if not row:
+                continue
+            if len(row) < len(header):
+                raise ValueError(
+                    f"{file_path}:{reader.line_num}: expected {len(header)} fields, got {len(row)}"
+                )
+            values = list(pick(row))
+            for pos, conv in conversions:
+                values[pos] = conv(values[pos])
+            yield values
 
 
 def reset_tables(conn: sqlite3.Connection):
-    conn.execute("PRAGMA foreign_keys = OFF;")
-    cursor = conn.cursor()
-    for table_name in reversed([cfg["name"] for cfg in TABLE_CONFIG]):
-        cursor.execute(f"DROP TABLE IF EXISTS {table_name}")
-    conn.commit()
-    conn.execute("PRAGMA foreign_keys = ON;")
-    cursor.executescript(";\n".join(cfg["schema"].strip() for cfg in TABLE_CONFIG))
-    conn.commit()
+    conn.executescript(RESET_SCRIPT)
+
 
+def stage_tables(conn: sqlite3.Connection):
+    conn.executescript(STAGE_SCRIPT)
+    for config in TABLE_CONFIG:
+        rows = iter_rows(config["csv"], config["columns"], FIELD_CONVERTERS)
+        insert_rows(conn, config["name"], config["columns"], rows)
+    conn.execute("COMMIT")
 
-def insert_rows(conn: sqlite3.Connection, table: str, columns: list[str], rows: list[dict[str, object]]):
-    placeholders = ", ".join(["?"] * len(columns))
+
+def copy_staged_rows(conn: sqlite3.Connection, table: str, columns: list[str]) -> int:
     column_list = ", ".join(columns)
-    sql = f"INSERT INTO {table} ({column_list}) VALUES ({placeholders})"
-    data = [[row[col] for col in columns] for row in rows]
-    conn.executemany(sql, data)
-    conn.commit()
+    sql = f"INSERT INTO main.{table} ({column_list}) SELECT {column_list} FROM {STAGE_SCHEMA}.{table}"
+    return conn.execute(sql).rowcount
+
+
+def create_indexes(conn: sqlite3.Connection):
+    cursor = conn.cursor()
+    for cfg in TABLE_CONFIG:
+        for statement in cfg["indexes"]:
+            cursor.execute(statement)
+
+
+def check_foreign_keys(conn: sqlite3.Connection):
+    violations = conn.execute("PRAGMA main.foreign_key_check;").fetchall()
+    if violations:
+        table, rowid, parent, _ = violations[0]
+        raise sqlite3.IntegrityError(
+            f"{len(violations)} foreign key violation(s); first: {table} row {rowid} -> {parent}"
+        )
+
+
+def insert_rows(
+    conn: sqlite3.Connection, table: str, columns: list[str], rows: Iterable[Sequence[object]]
+) -> int:
+    sql = SQL_BY_TABLE[table]
+    placeholders = ROW_PLACEHOLDERS_BY_TABLE[table]
+
+    max_vars = conn.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
+    limit = min(SMALL_TABLE_ROWS, max_vars // len(columns))
+    rows = iter(rows)
+    head = list(islice(rows, limit + 1))
+    if 0 < len(head) <= limit:
+        params = [value for row in head for value in row]
+        conn.execute(sql + ", ".join([placeholders] * len(head)), params)
+        return len(head)
+    return conn.executemany(sql + placeholders, chain(head, rows)).rowcount
 
 
 def main():
     if not DATA_DIR.exists():
         raise FileNotFoundError(f"Data directory not found: {DATA_DIR}")
 
-    with sqlite3.connect(DB_PATH) as conn:
-        reset_tables(conn)
+    with closing(sqlite3.connect(DB_PATH, cached_statements=STATEMENT_CACHE_SIZE)) as conn:
+        conn.executescript(LOAD_PRAGMAS)
+        conn.isolation_level = None
+        try:
+            stage_tables(conn)
+            reset_tables(conn)
 
-        for config in TABLE_CONFIG:
-            rows = load_csv(config["csv"])
-            insert_rows(conn, config["name"], config["columns"], rows)
-            print(f"Inserted {len(rows)} rows into {config['name']}.")
+            for config in TABLE_CONFIG:
+                count = copy_staged_rows(conn, config["name"], config["columns"])
+                print(f"Inserted {count} rows into {config['name']}.")
+            create_indexes(conn)
+            check_foreign_keys(conn)
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+        finally:
+            # WAL is only for the load; leave ecom.db readable without a -shm file.
+            conn.execute("PRAGMA main.journal_mode = DELETE;")
 
     print(f"SQLite database populated at {DB_PATH}")
 
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+from contextlib import closing
 import csv
 import sqlite3
 from pathlib import Path
+from typing import Iterable, Iterator
 
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 DB_PATH = ROOT_DIR / "ecom.db"
 OUTPUT_PATH = ROOT_DIR / "output" / "order_summary.csv"
+WRITE_BUFFER_SIZE = 1 << 20
+FETCH_BATCH_SIZE = 5000
 
 
 QUERY = """
@@ -26,31 +30,44 @@ ORDER BY o.order_date, o.order_id;
 """
 
 
-def fetch_order_summary() -> list[tuple]:
+def _iter_batches(
+    conn: sqlite3.Connection, cursor: sqlite3.Cursor, batch_size: int
+) -> Iterator[list[tuple]]:
+    with closing(conn):
+        while batch := cursor.fetchmany(batch_size):
+            yield batch
+
+
+def fetch_order_summary(batch_size: int = FETCH_BATCH_SIZE) -> Iterator[list[tuple]]:
     if not DB_PATH.exists():
         raise FileNotFoundError(f"Database not found: {DB_PATH}")
-    with sqlite3.connect(DB_PATH) as conn:
-        cursor = conn.cursor()
-        cursor.execute(QUERY)
-        rows = cursor.fetchall()
-    return rows
+    # Run the query before returning so it fails before the report is truncated.
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        cursor = conn.execute(QUERY)
+    except BaseException:
+        conn.close()
+        raise
+    return _iter_batches(conn, cursor, batch_size)
 
 
-def write_summary(rows: list[tuple]) -> None:
+def write_summary(batches: Iterable[list[tuple]]) -> int:
     OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
     headers = ["user_name", "product_name", "order_date", "review_rating", "payment_status"]
-    with OUTPUT_PATH.open("w", newline="", encoding="utf-8") as csvfile:
+    count = 0
+    with OUTPUT_PATH.open("w", newline="", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as csvfile:
         writer = csv.writer(csvfile)
         writer.writerow(headers)
-        writer.writerows(rows)
+        for batch in batches:
+            writer.writerows(batch)
+            count += len(batch)
+    return count
 
 
 def main():
-    rows = fetch_order_summary()
-    write_summary(rows)
-    print(f"Wrote {len(rows)} records to {OUTPUT_PATH}")
+    count = write_summary(fetch_order_summary())
+    print(f"Wrote {count} records to {OUTPUT_PATH}")
 
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import shutil
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "script"))
+
+import load_csv_to_sqlite  # noqa: E402
+
+
+def test_loads_into_missing_database(tmp_path, monkeypatch):
+    db_path = tmp_path / "ecom.db"
+    monkeypatch.setattr(load_csv_to_sqlite, "DB_PATH", db_path)
+
+    load_csv_to_sqlite.main()
+
+    with sqlite3.connect(db_path) as conn:
+        for config in load_csv_to_sqlite.TABLE_CONFIG:
+            (count,) = conn.execute(f"SELECT COUNT(*) FROM {config['name']}").fetchone()
+            assert count == 15
+        assert conn.execute("PRAGMA journal_mode").fetchone() == ("delete",)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["ecom.db"]
+
+
+def write_users_csv(data_dir: Path, body: str) -> None:
+    data_dir.mkdir(exist_ok=True)
+    header = "user_id,name,email,join_date,loyalty_tier\r\n"
+    (data_dir / "users.csv").write_text(header + body, encoding="utf-8", newline="")
+
+
+def test_iter_rows_skips_blank_lines(tmp_path, monkeypatch):
+    monkeypatch.setattr(load_csv_to_sqlite, "DATA_DIR", tmp_path)
+    write_users_csv(tmp_path, "U001,Ava,ava@x.com,2024-01-01,Gold\r\n\r\n")
+    columns = load_csv_to_sqlite.TABLE_CONFIG[0]["columns"]
+
+    rows = list(load_csv_to_sqlite.iter_rows("users.csv", columns, {}))
+
+    assert rows == [["U001", "Ava", "ava@x.com", "2024-01-01", "Gold"]]
+
+
+def test_iter_rows_rejects_short_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(load_csv_to_sqlite, "DATA_DIR", tmp_path)
+    write_users_csv(tmp_path, "U001,Ava,ava@x.com\r\n")
+    columns = load_csv_to_sqlite.TABLE_CONFIG[0]["columns"]
+
+    with pytest.raises(ValueError, match="expected 5 fields, got 3"):
+        list(load_csv_to_sqlite.iter_rows("users.csv", columns, {}))
+
+
+@pytest.mark.parametrize("value", ["", "abc"])
+def test_iter_rows_rejects_non_numeric_cells(tmp_path, monkeypatch, value):
+    monkeypatch.setattr(load_csv_to_sqlite, "DATA_DIR", tmp_path)
+    (tmp_path / "products.csv").write_text(
+        f"product_id,name,category,price,in_stock\r\nP001,Watch,Wearables,{value},5\r\n",
+        encoding="utf-8",
+    )
+    columns = load_csv_to_sqlite.TABLE_CONFIG[1]["columns"]
+
+    with pytest.raises(ValueError):
+        list(load_csv_to_sqlite.iter_rows("products.csv", columns, load_csv_to_sqlite.FIELD_CONVERTERS))
+
+
+def test_foreign_key_violation_rolls_back_load(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    shutil.copytree(load_csv_to_sqlite.DATA_DIR, data_dir)
+    db_path = tmp_path / "ecom.db"
+    monkeypatch.setattr(load_csv_to_sqlite, "DATA_DIR", data_dir)
+    monkeypatch.setattr(load_csv_to_sqlite, "DB_PATH", db_path)
+    load_csv_to_sqlite.main()
+
+    orders_csv = data_dir / "orders.csv"
+    orders_csv.write_text(orders_csv.read_text(encoding="utf-8").replace(",U001,", ",U999,"), encoding="utf-8")
+    with pytest.raises(sqlite3.IntegrityError, match="foreign key"):
+        load_csv_to_sqlite.main()
+
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT user_id FROM orders WHERE order_id = 'O001'").fetchone() == ("U001",)
+        assert conn.execute("PRAGMA journal_mode").fetchone() == ("delete",)
+
+
+@pytest.mark.parametrize(
+    ("row_count", "statements"),
+    [
+        (load_csv_to_sqlite.SMALL_TABLE_ROWS, 1),
+        (load_csv_to_sqlite.SMALL_TABLE_ROWS + 1, load_csv_to_sqlite.SMALL_TABLE_ROWS + 1),
+    ],
+)
+def test_insert_rows_switches_to_executemany_for_large_tables(row_count, statements):
+    conn = sqlite3.connect(":memory:")
+    conn.isolation_level = None
+    conn.executescript(load_csv_to_sqlite.STAGE_SCRIPT)
+    traced = []
+    conn.set_trace_callback(traced.append)
+    rows = ((f"U{idx}", "name", "email", "2024-01-01", "Gold") for idx in range(row_count))
+
+    inserted = load_csv_to_sqlite.insert_rows(
+        conn, "users", load_csv_to_sqlite.TABLE_CONFIG[0]["columns"], rows
+    )
+
+    inserts = [sql for sql in traced if sql.startswith("INSERT")]
+    assert inserted == row_count
+    assert conn.execute("SELECT COUNT(*) FROM stage.users").fetchone() == (row_count,)
+    assert len(inserts) == statements
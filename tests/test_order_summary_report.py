@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "script"))
+
+import load_csv_to_sqlite  # noqa: E402
+import order_summary_report  # noqa: E402
+
+
+@pytest.fixture
+def paths(tmp_path, monkeypatch):
+    db_path = tmp_path / "ecom.db"
+    output_path = tmp_path / "output" / "order_summary.csv"
+    monkeypatch.setattr(load_csv_to_sqlite, "DB_PATH", db_path)
+    monkeypatch.setattr(order_summary_report, "DB_PATH", db_path)
+    monkeypatch.setattr(order_summary_report, "OUTPUT_PATH", output_path)
+    return db_path, output_path
+
+
+def test_writes_every_order_across_batches(paths):
+    _, output_path = paths
+    load_csv_to_sqlite.main()
+
+    count = order_summary_report.write_summary(order_summary_report.fetch_order_summary(batch_size=4))
+
+    assert count == 15
+    assert len(output_path.read_text(encoding="utf-8").splitlines()) == 16
+
+
+def test_failed_query_keeps_existing_report(paths):
+    db_path, output_path = paths
+    sqlite3.connect(db_path).close()
+    output_path.parent.mkdir()
+    output_path.write_text("previous report\n", encoding="utf-8")
+
+    with pytest.raises(sqlite3.OperationalError):
+        order_summary_report.main()
+
+    assert output_path.read_text(encoding="utf-8") == "previous report\n"